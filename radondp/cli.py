@@ -1,15 +1,72 @@
 import datetime
+import functools
 import json
 import os
-import pandas as pd
-import requests
+import re
+import stat
+import sys
 
-from ansiblemetrics import metrics_extractor as ansible_metrics_extractor
-from toscametrics import metrics_extractor as tosca_metrics_extractor
 from argparse import ArgumentParser, ArgumentTypeError, Namespace
-from zipfile import ZipFile
+from concurrent.futures import ThreadPoolExecutor
+from zipfile import BadZipFile, ZipFile
 
-from .predictors import DefectPredictor
+# pandas, requests, the metrics extractors and the predictor are imported by the commands that use them,
+# so that --help, --version and argument errors do not pay for loading them.
+
+_BALANCERS = frozenset({'none', 'rus', 'ros'})
+_NORMALIZERS = frozenset({'none', 'minmax', 'std'})
+_CLASSIFIERS = frozenset({'dt', 'logit', 'nb', 'rf', 'svm'})
+
+# The files analyzed when predict is given a directory
+ARTEFACT_EXTENSIONS = {
+    'ansible': ('.yml', '.yaml'),
+    'tosca': ('.tosca', '.csar')
+}
+
+# Number of scripts sent at once to each process when extracting metrics in parallel
+_EXTRACTION_CHUNKSIZE = 8
+
+# Minimum number of scripts per worker process, for their analysis to outweigh the start of the process.
+# Starting a spawned worker and importing an extractor takes about 0.12 s, while analyzing a script takes from
+# about 0.06 s (a 780-byte playbook) to 0.15 s (a 4 KB Tosca definition). With 16 scripts, a worker spends at least
+# 8 times as long analyzing them as starting
+_SCRIPTS_PER_PROCESS = 16
+
+
+# (connect, read) timeouts in seconds for the requests to the online APIs
+_API_TIMEOUT = (3.05, 30)
+_SESSION = None
+
+
+@functools.lru_cache(maxsize=64)
+def _cached_stat_mode(x: str) -> int:
+    # lru_cache does not store raised exceptions, so only the paths that exist are cached
+    return os.stat(x).st_mode
+
+
+def _stat_mode(x: str) -> int:
+    """
+    Stat a path once per CLI run. The filesystem is not expected to change while the arguments are validated.
+    Only the paths found are cached: a missing path is checked again on every call, so it becomes valid once created.
+    Call _stat_mode.cache_clear() if a path found earlier may have been removed or replaced
+    :param x: a path
+    :return: the st_mode of the path, or 0 if it does not exist
+    """
+    try:
+        return _cached_stat_mode(x)
+    except (OSError, ValueError):
+        return 0
+
+
+_stat_mode.cache_clear = _cached_stat_mode.cache_clear
+
+
+def _isdir_cached(x: str) -> bool:
+    return stat.S_ISDIR(_stat_mode(x))
+
+
+def _isfile_cached(x: str) -> bool:
+    return stat.S_ISREG(_stat_mode(x))
 
 
 def valid_dir(x: str) -> str:
@@ -18,7 +75,7 @@ def valid_dir(x: str) -> str:
     :param x: a path
     :return: the path if exists; raise an ArgumentTypeError otherwise
     """
-    if not os.path.isdir(x):
+    if not _isdir_cached(x):
         raise ArgumentTypeError('Insert a valid path')
 
     return x
@@ -30,24 +87,57 @@ def valid_file(x: str) -> str:
     :param x: a path
     :return: the path if exists; raise an ArgumentTypeError otherwise
     """
-    if not os.path.isfile(x):
+    if not _isfile_cached(x):
+        raise ArgumentTypeError('Insert a valid path')
+
+    return x
+
+
+def valid_path(x: str) -> str:
+    """
+    Check the file or directory exists
+    :param x: a path
+    :return: the path if exists; raise an ArgumentTypeError otherwise
+    """
+    if not (_isfile_cached(x) or _isdir_cached(x)):
         raise ArgumentTypeError('Insert a valid path')
 
     return x
 
 
+def _first_invalid(values: list, choices: frozenset):
+    """
+    :param values: a list of values
+    :param choices: the allowed values
+    :return: the first value not in choices, or None if they are all allowed
+    """
+    invalid = set(values) - choices
+    return next((value for value in values if value in invalid), None)
+
+
+@functools.lru_cache(maxsize=None)
+def _whitespace_separated(choices: frozenset):
+    """
+    Compile a regex matching a whitespace-separated list of one or more allowed values.
+    Each regex is compiled on first use, so that importing the CLI does not pay for it
+    :param choices: the allowed values
+    :return: the compiled regex
+    """
+    alternatives = '|'.join(sorted(choices))
+    return re.compile(rf'\s*(?:{alternatives})(?:\s+(?:{alternatives}))*\s*')
+
+
 def valid_balancers(x: str):
     """
     Check x is a list of valid balancers
     :param x: a string representing a list of balancers (e.g., "none rus ros")
     :return: the list of balancers if every argument in x is a valid balancer; raise an ArgumentTypeError otherwise
     """
-    balancers = x.split(' ')
-    for balancer in balancers:
-        if balancer not in ('none', 'rus', 'ros'):
-            raise ArgumentTypeError(f'{balancer} is not a valid argument')
+    if not _whitespace_separated(_BALANCERS).fullmatch(x):
+        balancer = _first_invalid(x.split(), _BALANCERS) or x
+        raise ArgumentTypeError(f'{balancer} is not a valid argument')
 
-    return balancers
+    return x.split()
 
 
 def valid_normalizers(x: str):
@@ -56,12 +146,11 @@ def valid_normalizers(x: str):
     :param x: a string representing a list of normalizers (e.g., "none minmax std")
     :return: the list of normalizers if every argument in x is a valid normalizer; raise an ArgumentTypeError otherwise
     """
-    normalizers = x.split(' ')
-    for normalizer in normalizers:
-        if normalizer not in ('none', 'minmax', 'std'):
-            raise ArgumentTypeError(f'{normalizer} is not a valid argument')
+    if not _whitespace_separated(_NORMALIZERS).fullmatch(x):
+        normalizer = _first_invalid(x.split(), _NORMALIZERS) or x
+        raise ArgumentTypeError(f'{normalizer} is not a valid argument')
 
-    return normalizers
+    return x.split()
 
 
 def valid_classifiers(x: str):
@@ -70,110 +159,197 @@ def valid_classifiers(x: str):
     :param x: a string representing a list of classifiers (e.g., "dt logit nb rf svm")
     :return: the list of classifiers if every argument in x is a valid classifier; raise an ArgumentTypeError otherwise
     """
-    classifiers = x.split(' ')
-    for classifier in classifiers:
-        if classifier not in ('dt', 'logit', 'nb', 'rf', 'svm'):
-            raise ArgumentTypeError(f'{classifier} is not a valid argument')
+    if not _whitespace_separated(_CLASSIFIERS).fullmatch(x):
+        classifier = _first_invalid(x.split(), _CLASSIFIERS) or x
+        raise ArgumentTypeError(f'{classifier} is not a valid argument')
 
-    return classifiers
+    return x.split()
 
 
-def set_train_parser(subparsers):
-    parser = subparsers.add_parser('train', help='Train a brand new model from scratch')
-    parser.add_argument(action='store',
-                        dest='path_to_csv',
-                        type=valid_file,
-                        help='the path to the csv file containing the data for training')
+class CLIParser(ArgumentParser):
+    """
+    An ArgumentParser that reuses a single formatter for the checks run by add_argument(),
+    instead of building new ones for every argument.
+    On Python 3.14+ it also disables colored output, which probes the environment whenever a formatter is created.
+    """
 
-    parser.add_argument(dest='classifiers',
-                        type=valid_classifiers,
-                        help='a list of classifiers to train. Possible choices [dt, logit, nb, rf, svm]')
+    def __init__(self, *args, **kwargs):
+        if sys.version_info >= (3, 14):
+            kwargs.setdefault('color', False)
 
-    parser.add_argument('-b', '--balancers',
-                        required=False,
-                        dest='balancers',
-                        type=valid_balancers,
-                        help='a list of balancer to balance training data. Possible choices [none, rus, ros]')
+        self._validation_formatter = None
+        super().__init__(*args, **kwargs)
 
-    parser.add_argument('-n', '--normalizers',
-                        required=False,
-                        dest='normalizers',
-                        type=valid_normalizers,
-                        help='a list of normalizers to normalize data. Possible choices [none, minmax, std]')
+    def add_argument(self, *args, **kwargs):
+        # The formatter is only used to validate metavar and help strings here, so it is safe to share.
+        # The help and usage messages keep getting a fresh one from _get_formatter()
+        if self._validation_formatter is None:
+            self._validation_formatter = self._get_formatter()
 
-    # TODO: add feature-selectors
+        self._get_formatter = lambda: self._validation_formatter
+        try:
+            return super().add_argument(*args, **kwargs)
+        finally:
+            del self._get_formatter
 
+    def add_subparsers(self, **kwargs):
+        # Keep a reference to the commands, to complete the parser of the chosen one after a first parsing pass
+        self.commands = super().add_subparsers(**kwargs)
+        return self.commands
 
-    """
-    parser.add_argument('--verbose',
-                        action='store_true',
-                        dest='verbose',
-                        default=False,
-                        help='show log')
-    """
 
+# The arguments of each command, as (option strings, keyword arguments) pairs for ArgumentParser.add_argument()
+TRAIN_ARGUMENTS = (
+    ((), dict(action='store',
+              dest='path_to_csv',
+              type=valid_file,
+              help='the path to the csv file containing the data for training')),
 
-def set_predict_parser(subparsers):
-    parser = subparsers.add_parser('predict', help='Predict unseen instances')
+    ((), dict(dest='classifiers',
+              type=str.split,
+              help='a list of classifiers to train. Possible choices [dt, logit, nb, rf, svm]')),
 
-    parser.add_argument(action='store',
-                        dest='language',
-                        type=str,
-                        choices=['ansible', 'tosca'],
-                        help='the language of the file (i.e., TOSCA or YAML-based Ansible)')
+    (('-b', '--balancers'), dict(required=False,
+                                 dest='balancers',
+                                 type=str.split,
+                                 help='a list of balancer to balance training data. Possible choices [none, rus, ros]')),
 
-    parser.add_argument(action='store',
-                        dest='path_to_artefact',
-                        type=valid_file,
-                        help='the path to the artefact to analyze (i.e., an Ansible or Tosca file or .csar')
+    (('-n', '--normalizers'), dict(required=False,
+                                   dest='normalizers',
+                                   type=str.split,
+                                   help='a list of normalizers to normalize data. Possible choices [none, minmax, std]')),
 
+    # TODO: add feature-selectors
 
-def set_download_model_parser(subparsers):
-    parser = subparsers.add_parser('download-model', help='Download a pre-trained model from the online APIs')
+    # (('--verbose',), dict(action='store_true', dest='verbose', default=False, help='show log')),
+)
+
+PREDICT_ARGUMENTS = (
+    ((), dict(action='store',
+              dest='language',
+              type=str,
+              choices=['ansible', 'tosca'],
+              help='the language of the file (i.e., TOSCA or YAML-based Ansible)')),
+
+    ((), dict(action='store',
+              dest='path_to_artefact',
+              type=valid_path,
+              help='the path to the artefact to analyze (i.e., an Ansible or Tosca file or .csar, '
+                   'or a directory containing them)')),
+)
+
+DOWNLOAD_MODEL_ARGUMENTS = (
+    ((), dict(action='store',
+              dest='language',
+              type=str,
+              choices=['ansible', 'tosca'],
+              help='the language the model is trained on')),
+
+    ((), dict(action='store',
+              dest='host',
+              type=str,
+              choices=['github', 'gitlab'],
+              help='the platform the user\'s repository is hosted to')),
+
+    ((), dict(action='store',
+              dest='repository',
+              type=str,
+              help='the user\'s remote repository in the form <namespace>/<repository> '
+                   '(e.g., radon-h2020/radon-defect-prediction-cli)')),
+)
+
+
+def add_arguments(parser: ArgumentParser, arguments):
+    for option_strings, kwargs in arguments:
+        parser.add_argument(*option_strings, **kwargs)
+
+
+# The help message and arguments of each command
+COMMAND_PARSERS = {
+    'train': ('Train a brand new model from scratch', TRAIN_ARGUMENTS),
+    'download-model': ('Download a pre-trained model from the online APIs', DOWNLOAD_MODEL_ARGUMENTS),
+    'predict': ('Predict unseen instances', PREDICT_ARGUMENTS)
+}
+
+
+def set_command_parser(subparsers, command: str, lazy: bool = False):
+    """
+    Add the parser of a command
+    :param subparsers: the subparsers of the main parser
+    :param command: the name of the command (i.e., train, download-model or predict)
+    :param lazy: if True, only register the command name and help; build_command_parser() adds its arguments later
+    """
+    help_message, arguments = COMMAND_PARSERS[command]
+    parser = subparsers.add_parser(command, help=help_message, add_help=not lazy)
 
-    parser.add_argument(action='store',
-                        dest='language',
-                        type=str,
-                        choices=['ansible', 'tosca'],
-                        help='the language the model is trained on')
+    if not lazy:
+        add_arguments(parser, arguments)
 
-    parser.add_argument(action='store',
-                        dest='host',
-                        type=str,
-                        choices=['github', 'gitlab'],
-                        help='the platform the user\'s repository is hosted to')
 
-    parser.add_argument(action='store',
-                        dest='repository',
-                        type=str,
-                        help='the user\'s remote repository in the form <namespace>/<repository> (e.g., radon-h2020/radon-defect-prediction-cli)')
+def build_command_parser(parser: ArgumentParser, command: str) -> ArgumentParser:
+    """
+    Add the help option and arguments of a command registered with get_parser(lazy=True)
+    :param parser: the main parser
+    :param command: the name of the command (i.e., train, download-model or predict)
+    :return: the parser of the command
+    """
+    command_parser = parser.commands.choices[command]
+    command_parser.add_argument('-h', '--help', action='help', help='show this help message and exit')
+    add_arguments(command_parser, COMMAND_PARSERS[command][1])
+    return command_parser
 
 
-def get_parser():
+def get_parser(lazy: bool = False):
+    """
+    :param lazy: if True, the commands are registered without their arguments, which build_command_parser() adds
+    only for the command being run
+    :return: the parser of the CLI
+    """
     description = 'A Python library to train machine learning models for defect prediction of infrastructure code'
 
-    parser = ArgumentParser(prog='radon-defect-predictor', description=description)
+    parser = CLIParser(prog='radon-defect-predictor', description=description)
     parser.add_argument('-v', '--version', action='version', version='%(prog)s 0.2.7')
     subparsers = parser.add_subparsers(dest='command')
 
-    set_train_parser(subparsers)
-    set_download_model_parser(subparsers)
-    set_predict_parser(subparsers)
+    for command in COMMAND_PARSERS:
+        set_command_parser(subparsers, command, lazy)
 
     return parser
 
 
-def train(args: Namespace):
+def get_session():
+    """
+    Return the HTTP session used to call the online APIs, creating it on first use.
+    The session keeps the connection alive between requests, and retries on gateway errors
+    :return: a requests.Session
+    """
+    global _SESSION
+
+    if _SESSION is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        retry = Retry(total=3, backoff_factor=0.2, status_forcelist=(502, 503, 504), raise_on_status=False)
+        _SESSION = requests.Session()
+        _SESSION.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=1, max_retries=retry))
+
+    return _SESSION
+
+
+def train(args: Namespace) -> int:
+    from .predictors import DefectPredictor, read_training_data
+
     dp = DefectPredictor()
     dp.balancers = args.balancers if hasattr(args, 'balancers') else []
     dp.normalizers = args.normalizers if hasattr(args, 'normalizers') else []
     dp.classifiers = args.classifiers if hasattr(args, 'classifiers') else []
-    dp.train(pd.read_csv(args.path_to_csv))
+    dp.train(read_training_data(args.path_to_csv))
     dp.dump_model(os.getcwd())
-    exit(0)
+    return 0
 
 
-def model(args: Namespace):
+def model(args: Namespace) -> int:
     """
         # Compute scores
         print('Downloading model...')
@@ -183,127 +359,282 @@ def model(args: Namespace):
             host=args.host
         )
 
-        scores['commitFrequency'] = scores['commit_frequency']
-        scores['coreContributors'] = scores['core_contributors']
-        //scores['issueFrequency'] = scores['issue_frequency']
-        scores['percentComments'] = scores['percent_comment']
-        scores['percentIac'] = scores['iac_ratio']
-        scores['sloc'] = scores['repository_size']
+        // Rename rather than copy the scores, so that the query carries each score once
+        rename = {
+            'commit_frequency': 'commitFrequency',
+            'core_contributors': 'coreContributors',
+            //'issue_frequency': 'issueFrequency',
+            'percent_comment': 'percentComments',
+            'iac_ratio': 'percentIac',
+            'repository_size': 'sloc'
+        }
+
+        for old, new in rename.items():
+            scores[new] = scores.pop(old)
 
         // TODO: Add parameters to url query
     """
 
+    from requests import RequestException
+
     language = args.language if hasattr(args, 'language') else ''
 
     url = f'https://radon-test-api.herokuapp.com/models/?language={language}&repository_size=100&return_model=1'
-    r = requests.get(url, stream=True)
+    dest = os.path.join(os.getcwd(), 'radondp_model.joblib')
 
-    if r.content:
+    try:
+        r = get_session().get(url, stream=True, timeout=_API_TIMEOUT)
 
-        try:
-            content = json.loads(r.content)
-            if 'ERROR' in content:
-                print('ERROR:', content['ERROR'])
-                exit(1)
-        except UnicodeError:
-            pass
+        chunks = r.iter_content(chunk_size=1024 * 1024)
+        head = next(chunks, b'')
+
+        if head.lstrip().startswith(b'{'):
+            # Errors are sent as a JSON object, while models are binary joblib dumps. Only the former is read in memory
+            head += b''.join(chunks)
+            chunks = iter(())
+
+            try:
+                content = json.loads(head)
+                if 'ERROR' in content:
+                    print('ERROR:', content['ERROR'])
+                    return 1
+            except ValueError:
+                pass
 
-    if r.ok:
-        dest = os.path.join(os.getcwd(), 'radondp_model.joblib')
+        if not r.ok:  # HTTP status code 4XX/5XX
+            body = (head + b''.join(chunks)).decode(r.encoding or 'utf-8', errors='replace')
+            print("Download failed: status code {}\n{}".format(r.status_code, body))
+            return 1
 
         # For debug
         print("Saving to", dest)
 
-        with open(dest, 'wb') as f:
-            for chunk in r.iter_content(chunk_size=1024 * 8):
-                if chunk:
+        try:
+            with open(dest, 'wb') as f:
+                f.write(head)
+                for chunk in chunks:
                     f.write(chunk)
-                    f.flush()
-                    os.fsync(f.fileno())
-    else:  # HTTP status code 4XX/5XX
-        print("Download failed: status code {}\n{}".format(r.status_code, r.text))
-        exit(1)
 
-    exit(0)
+                f.flush()
+                os.fsync(f.fileno())
+        except RequestException:
+            # Do not leave a truncated model behind
+            os.remove(dest)
+            raise
+
+    except RequestException as e:  # Connection errors and timeouts, once the retries are exhausted
+        print("Download failed: {}".format(e))
+        return 1
+
+    return 0
+
+
+def read_scripts(path_to_artefact: str, language: str):
+    """
+    Read the scripts to analyze within an artefact. Within a directory, the files that cannot be read are skipped
+    :param path_to_artefact: the path to an Ansible or Tosca file, a .csar, or a directory containing them
+    :param language: the language of the scripts (i.e., ansible or tosca)
+    :return: a generator of (file, script content) pairs
+    """
+    if os.path.isdir(path_to_artefact):
+        for root, dirs, files in os.walk(path_to_artefact):
+            dirs.sort()
+            for filename in sorted(files):
+                if filename.endswith(ARTEFACT_EXTENSIONS[language]):
+                    # Read each file fully before yielding it, so that an unreadable file (e.g., not UTF-8 encoded,
+                    # or a corrupt .csar) is skipped as a whole without stopping the walk
+                    try:
+                        yield from list(read_scripts(os.path.join(root, filename), language))
+                    except (OSError, ValueError, BadZipFile):
+                        pass
+
+    elif language == 'tosca' and path_to_artefact.endswith('.csar'):
+        with ZipFile(path_to_artefact, 'r') as zip_file:
+            for filepath in zip_file.namelist():
+                if filepath.endswith('.tosca'):
+                    try:
+                        yield os.path.join(path_to_artefact, filepath), zip_file.read(filepath).decode('utf-8')
+                    except ValueError:
+                        pass
+    else:
+        with open(path_to_artefact, 'r') as f:
+            yield path_to_artefact, f.read()
+
+
+def extract_metrics(language: str, script_content: str) -> dict:
+    """
+    Extract the metrics from an Ansible or Tosca script
+    :param language: the language of the script (i.e., ansible or tosca)
+    :param script_content: the content of the script
+    :return: a dictionary mapping each metric to its value
+    """
+    if language == 'ansible':
+        from ansiblemetrics import metrics_extractor
+    else:
+        from toscametrics import metrics_extractor
+
+    return metrics_extractor.extract_all(script_content)
+
+
+def _extract_metrics_or_none(language: str, script_content: str):
+    import yaml
+
+    try:
+        return extract_metrics(language, script_content)
+    except (AttributeError, LookupError, TypeError, ValueError, yaml.YAMLError):
+        # The extractors raise any of these on scripts they cannot parse, or whose YAML is not of the expected shape
+        # (e.g., a Tosca file containing a list or a scalar)
+        return None
+
 
+def _main_is_importable() -> bool:
+    """
+    :return: True if spawned processes can import the main module again, i.e., unless it was read from stdin
+    """
+    path = getattr(sys.modules['__main__'], '__file__', None)
+    return path is None or os.path.isfile(path)
 
-def predict(args: Namespace):
+
+def extract_all_metrics(language: str, scripts: list) -> list:
+    """
+    Extract the metrics from many scripts, skipping those that cannot be parsed.
+    Large batches are split across worker processes, from Python 3.7 on. The workers are spawned and import the main
+    module again, so a script calling this function (or predict()) must do it under an if __name__ == '__main__' guard
+    to run it in parallel. Otherwise, or when the main module is read from stdin, the scripts are analyzed in the
+    calling process
+    :param language: the language of the scripts (i.e., ansible or tosca)
+    :param scripts: a list of script contents
+    :return: the metrics of each script, in order; None for the scripts that cannot be parsed
+    """
+    processes = min(os.cpu_count() or 1, len(scripts) // _SCRIPTS_PER_PROCESS)
+
+    # ProcessPoolExecutor takes an mp_context only from Python 3.7
+    if processes > 1 and sys.version_info >= (3, 7) and _main_is_importable():
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        from concurrent.futures.process import BrokenProcessPool
+
+        # Spawn rather than fork the workers, as predict() may be loading the model on another thread
+        try:
+            with ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context('spawn')) as executor:
+                return list(executor.map(_extract_metrics_or_none, [language] * len(scripts), scripts,
+                                         chunksize=_EXTRACTION_CHUNKSIZE))
+        except BrokenProcessPool:
+            # The workers failed to start, e.g., because the main module has no if __name__ == '__main__' guard
+            pass
+
+    return [_extract_metrics_or_none(language, script_content) for script_content in scripts]
+
+
+def predict(args: Namespace) -> int:
+    from .predictors import DefectPredictor, prepare_unseen_data
 
     if not hasattr(args, 'language') or args.language not in ('ansible', 'tosca'):
         print('Please, provide a valid language. Choose one between [ansible, tosca]')
-        exit(1)
+        return 1
 
     if not hasattr(args, 'path_to_artefact'):
-        print('Please, provide a path to a valid Ansible or Tosca artifact. The file extension must be a .yml or .csar.')
-        exit(1)
+        print('Please, provide a path to a valid Ansible or Tosca artifact, or to a directory containing them. '
+              'The file extension must be a .yml or .csar.')
+        return 1
+
+    workdir = os.getcwd()
+    analyzed_at = str(datetime.date.today())
+
+    if not os.path.isfile(os.path.join(workdir, 'radondp_model.joblib')):
+        print('No model found in {}. Please, train or download a model first.'.format(workdir))
+        return 1
 
     dp = DefectPredictor()
-    dp.load_model(os.getcwd())
 
-    report = []
+    # Load the model in the background while the metrics are extracted, so that reading it from disk
+    # overlaps with parsing the artefact
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        loading = executor.submit(dp.load_model, workdir)
+
+        files, scripts = [], []
+        for file, script_content in read_scripts(args.path_to_artefact, args.language):
+            files.append(file)
+            scripts.append(script_content)
 
-    # Extract metrics
-    if args.language == 'ansible':
-        # Read content of the script to analyze
-        with open(args.path_to_artefact, 'r') as f:
-            script_content = f.read()
-        unseen_data = pd.DataFrame(ansible_metrics_extractor.extract_all(script_content), index=[0])
-        prediction = dp.predict(unseen_data)
-        report.append(dict(
-            file=args.path_to_artefact,
-            failure_prone=prediction,
-            analyzed_at=str(datetime.date.today())
-        ))
-
-    else:  # tosca
-
-        if args.path_to_artefact.endswith('.csar'):
-
-            with ZipFile(args.path_to_artefact, 'r') as zip_file:
-                for filepath in zip_file.namelist():
-                    if filepath.endswith('.tosca'):
-                        try:
-                            script_content = zip_file.read(filepath).decode('utf-8')
-                            unseen_data = pd.DataFrame(tosca_metrics_extractor.extract_all(script_content), index=[0])
-                            prediction = dp.predict(unseen_data)
-                            report.append(dict(
-                                file=os.path.join(args.path_to_artefact, filepath),
-                                failure_prone=prediction,
-                                analyzed_at=str(datetime.date.today())
-                            ))
-                        except ValueError:
-                            pass
+        # Fail before the extraction if the model could not be loaded in the meantime
+        if loading.done():
+            loading.result()
+
+        if os.path.isfile(args.path_to_artefact) and files == [args.path_to_artefact]:
+            # A single script given explicitly: report its parsing errors rather than skipping it
+            metrics = [extract_metrics(args.language, scripts[0])]
         else:
-            # Read content of the script to analyze
-            with open(args.path_to_artefact, 'r') as f:
-                script_content = f.read()
+            metrics = extract_all_metrics(args.language, scripts)
 
-            unseen_data = pd.DataFrame(tosca_metrics_extractor.extract_all(script_content), index=[0])
+        observations = [(file, file_metrics) for file, file_metrics in zip(files, metrics) if file_metrics is not None]
 
-            prediction = dp.predict(unseen_data)
-            report.append(dict(
-                file=args.path_to_artefact,
-                failure_prone=prediction,
-                analyzed_at=str(datetime.date.today())
-            ))
+        loading.result()
+
+    report = []
+
+    if observations:
+        # Predict all the observations at once
+        predictions = dp.predict_all(prepare_unseen_data([file_metrics for _, file_metrics in observations]))
+        report = [dict(file=file, failure_prone=prediction, analyzed_at=analyzed_at)
+                  for (file, _), prediction in zip(observations, predictions)]
 
     if report:
-        destination = os.path.join(os.getcwd(), 'radondp_predictions.json')
-        if os.path.isfile(destination):
-            with open(destination, 'r') as f:
+        destination = os.path.join(workdir, 'radondp_predictions.json')
+        try:
+            with open(destination, 'r', encoding='utf-8') as f:
                 report.extend(json.load(f))
+        except FileNotFoundError:
+            pass
+
+        # Serialize the whole report first, so that it is written with a single write() rather than json.dump()'s
+        # many small ones through the text layer
+        payload = json.dumps(report, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        with open(destination, 'wb') as f:
+            f.write(payload)
+
+    return 0
+
 
-        with open(destination, 'w') as f:
-            json.dump(report, f)
+COMMANDS = {
+    'train': train,
+    'download-model': model,
+    'predict': predict
+}
 
-    exit(0)
+
+def check_train_args(parser: ArgumentParser, args: Namespace):
+    """
+    Check the balancers, normalizers and classifiers of the train command, once they have all been parsed.
+    Exit with a usage error if a list is given empty, or naming its first invalid value, if any
+    """
+    for dest, choices in (('classifiers', _CLASSIFIERS), ('balancers', _BALANCERS), ('normalizers', _NORMALIZERS)):
+        values = getattr(args, dest, None)
+        if values is None:
+            continue
+
+        if not values:
+            parser.error(f'the list of {dest} cannot be empty')
+
+        value = _first_invalid(values, choices)
+        if value is not None:
+            parser.error(f'{value} is not a valid argument')
 
 
 def main():
-    args = get_parser().parse_args()
+    parser = get_parser(lazy=True)
+
+    # Parse the command first, then build the parser of that command only and parse its arguments
+    args, remaining_args = parser.parse_known_args()
+    if args.command is None:
+        if remaining_args:
+            parser.error('unrecognized arguments: {}'.format(' '.join(remaining_args)))
+        return
+
+    command_parser = build_command_parser(parser, args.command)
+    args = command_parser.parse_args(remaining_args, namespace=args)
+
     if args.command == 'train':
-        train(args)
-    elif args.command == 'download-model':
-        model(args)
-    elif args.command == 'predict':
-        predict(args)
+        check_train_args(command_parser, args)
+
+    sys.exit(COMMANDS[args.command](args))
@@ -19,6 +19,41 @@ from .normalizers import normalizers_map
 from .model_validation import walk_forward_release
 
 
+METADATA_COLUMNS = ('commit', 'committed_at', 'failure_prone', 'filepath')
+STRING_COLUMNS = ('commit', 'committed_at', 'filepath')
+
+
+def read_training_data(path_to_csv: str) -> pd.DataFrame:
+    """
+    Read the training data, loading the metrics as float32 instead of letting pandas infer a type for each column,
+    and commit, committed_at and filepath as strings.
+    If pyarrow is installed, the file is parsed by its multithreaded CSV reader
+    :param path_to_csv: the path to the csv file containing the data for training
+    :return: a pandas DataFrame
+    """
+    columns = pd.read_csv(path_to_csv, nrows=0).columns
+    metrics = [column for column in columns if column not in METADATA_COLUMNS]
+    strings = [column for column in columns if column in STRING_COLUMNS]
+
+    try:
+        import pyarrow
+        from pyarrow import csv
+    except ImportError:
+        dtype = {metric: np.float32 for metric in metrics}
+        dtype.update({column: str for column in strings})
+        return pd.read_csv(path_to_csv, dtype=dtype, engine='c')
+
+    column_types = {metric: pyarrow.float32() for metric in metrics}
+    column_types.update({column: pyarrow.string() for column in strings})
+
+    # Empty strings are read as missing values, like pandas does
+    table = csv.read_csv(path_to_csv,
+                         read_options=csv.ReadOptions(block_size=16 << 20, use_threads=True),
+                         convert_options=csv.ConvertOptions(column_types=column_types, strings_can_be_null=True))
+
+    return table.to_pandas(self_destruct=True, split_blocks=True)
+
+
 def prepare_training_data(data: pd.DataFrame):
     assert 'failure_prone' in data.columns
     assert 'commit' in data.columns
@@ -42,6 +77,20 @@ def prepare_training_data(data: pd.DataFrame):
     return X, y
 
 
+def prepare_unseen_data(metrics: List[dict]) -> pd.DataFrame:
+    """
+    Build the observations to predict from the metrics extracted from one or more scripts
+    :param metrics: a list with a dictionary per script, mapping each metric to its value
+    :return: a pandas DataFrame with a row per script and a float32 column per metric found in any script.
+    A metric missing from a script is set to zero, as DefectPredictor.predict_all() does for the missing features
+    """
+    # The union of the metrics, in the order they are first found
+    columns = list(dict.fromkeys(column for observation in metrics for column in observation))
+    values = np.array([[observation.get(column, 0) for column in columns] for observation in metrics],
+                      dtype=np.float32)
+    return pd.DataFrame(values, columns=columns, copy=False)
+
+
 class DefectPredictor:
 
     def __init__(self, verbose: int = 0):
@@ -146,9 +195,8 @@ class DefectPredictor:
             # Add additional metadata to the cv_results
             search.cv_results_['best_index_'] = search.best_index_
 
-            buffer = io.StringIO()
-            pd.DataFrame(search.cv_results_).to_json(buffer, orient='table', index=False)
-            self.cv_report_map[classifier] = json.loads(buffer.getvalue())
+            report = pd.DataFrame(search.cv_results_).to_json(orient='table', index=False)
+            self.cv_report_map[classifier] = json.loads(report)
 
             # Get the highest average_precision for this randomized search
             local_best_average_precision = search.cv_results_['mean_test_average_precision'][search.best_index_]
@@ -167,6 +215,14 @@ class DefectPredictor:
         :param unseen_data: pandas DataFrame containing the observation to predict
         :return: True if failure-prone. False, otherwise.
         """
+        return self.predict_all(unseen_data)[0]
+
+    def predict_all(self, unseen_data: pd.DataFrame) -> List[bool]:
+        """
+        Predict many unseen instances as failure-prone or clean, with a single call to the classifier.
+        :param unseen_data: pandas DataFrame containing an observation to predict per row
+        :return: a list with a prediction per row: True if failure-prone. False, otherwise.
+        """
         if not self.best_estimator:
             raise Exception('No model has been loaded yet. Please, load a model using instance.load(path_to_model_dir)')
 
@@ -183,9 +239,7 @@ class DefectPredictor:
             unseen_data = pd.DataFrame(self.best_estimator.named_steps['normalization'].transform(unseen_data))
 
         clf = self.best_estimator.named_steps['classification']
-        prediction = bool(clf.predict(unseen_data)[0])
-
-        return prediction
+        return [bool(prediction) for prediction in clf.predict(unseen_data)]
 
     def load_model(self, path_to_dir: str):
         """
@@ -5,7 +5,8 @@ import shutil
 import unittest
 
 from argparse import Namespace
-from radondp.cli import train, model as download_model, predict
+from unittest import mock
+from radondp.cli import train, model as download_model, predict, extract_all_metrics
 
 
 class CLIAnsibleTestCase(unittest.TestCase):
@@ -77,95 +78,149 @@ class CLIAnsibleTestCase(unittest.TestCase):
             path_to_csv=self.training_data_csv
         )
 
-        try:
-            train(args)
-        except SystemExit as exc:
-            assert exc.code == 0
-            shutil.move('./radondp_model.joblib', os.path.join(self.train_dir, "radondp_model.joblib"))
+        assert train(args) == 0
+        shutil.move('./radondp_model.joblib', os.path.join(self.train_dir, "radondp_model.joblib"))
 
-            assert 'radondp_model.joblib' in os.listdir(self.train_dir)
+        assert 'radondp_model.joblib' in os.listdir(self.train_dir)
 
-            model = joblib.load(os.path.join(self.train_dir, 'radondp_model.joblib'), mmap_mode='r')
-            assert model['estimator']
-            assert model['selected_features']
-            assert model['report']
+        model = joblib.load(os.path.join(self.train_dir, 'radondp_model.joblib'), mmap_mode='r')
+        assert model['estimator']
+        assert model['selected_features']
+        assert model['report']
 
     def test_download_model_no_language(self):
         args = Namespace()
 
-        try:
-            download_model(args)
-        except SystemExit as exc:
-            assert exc.code != 0
+        assert download_model(args) != 0
 
     def test_download_model_wrong_language(self):
         args = Namespace(language='wrong-language')
 
-        try:
-            download_model(args)
-        except SystemExit as exc:
-            assert exc.code != 0
+        assert download_model(args) != 0
 
     def test_download_model(self):
         args = Namespace(language='ansible')
 
-        try:
-            download_model(args)
-        except SystemExit as exc:
-            assert exc.code == 0
-            shutil.move('./radondp_model.joblib', os.path.join(self.download_model_dir, "radondp_model.joblib"))
+        assert download_model(args) == 0
+        shutil.move('./radondp_model.joblib', os.path.join(self.download_model_dir, "radondp_model.joblib"))
 
-            model = joblib.load(os.path.join(self.download_model_dir, 'radondp_model.joblib'), mmap_mode='r')
-            assert model['estimator']
-            assert model['selected_features']
+        model = joblib.load(os.path.join(self.download_model_dir, 'radondp_model.joblib'), mmap_mode='r')
+        assert model['estimator']
+        assert model['selected_features']
 
     def test_predict_no_language(self):
         args = Namespace(path_to_artefact=self.playbook)
 
-        try:
-            predict(args)
-        except SystemExit as exc:
-            assert exc.code != 0
+        assert predict(args) != 0
 
     def test_predict_wrong_language(self):
         args = Namespace(language='wrong-language', path_to_artefact=self.playbook)
 
-        try:
-            predict(args)
-        except SystemExit as exc:
-            assert exc.code != 0
+        assert predict(args) != 0
 
     def test_predict_no_artefact_path(self):
         args = Namespace(language='ansible')
 
-        try:
-            predict(args)
-        except SystemExit as exc:
-            assert exc.code != 0
+        assert predict(args) != 0
+
+    def test_predict_no_model(self):
+        args = Namespace(language='ansible', path_to_artefact=self.playbook)
+
+        with mock.patch('radondp.cli.extract_metrics') as extract:
+            assert predict(args) != 0
+            extract.assert_not_called()
+
+        assert not os.path.exists(os.path.join(os.getcwd(), 'radondp_predictions.json'))
 
     def test_predict(self):
         args = Namespace(language='ansible', path_to_artefact=self.playbook)
 
-        try:
-            shutil.copy(os.path.join(os.getcwd(), "test_data", "radondp_model_ansible.joblib"),
-                        os.path.join(os.getcwd(), 'radondp_model.joblib'))
+        shutil.copy(os.path.join(os.getcwd(), "test_data", "radondp_model_ansible.joblib"),
+                    os.path.join(os.getcwd(), 'radondp_model.joblib'))
+
+        assert predict(args) == 0
+
+        shutil.move(os.path.join(os.getcwd(), 'radondp_model.joblib'),
+                    os.path.join( self.predict_dir, 'radondp_model_ansible.joblib'))
+
+        shutil.move(os.path.join(os.getcwd(), 'radondp_predictions.json'),
+                    os.path.join( self.predict_dir, 'radondp_predictions.json'))
+
+        with open(os.path.join(self.predict_dir, 'radondp_predictions.json'), 'r') as f:
+            predictions = json.load(f)
+            assert len(predictions) == 1
+            assert predictions[0]['file'] == self.playbook
+            assert type(predictions[0]['failure_prone']) == bool
+
+    def test_predict_directory(self):
+        playbooks_dir = os.path.join(self.predict_dir, 'playbooks')
+        os.mkdir(playbooks_dir)
+        shutil.copy(self.playbook, os.path.join(playbooks_dir, 'first.yml'))
+        shutil.copy(self.playbook, os.path.join(playbooks_dir, 'second.yml'))
+
+        args = Namespace(language='ansible', path_to_artefact=playbooks_dir)
+
+        shutil.copy(os.path.join(os.getcwd(), "test_data", "radondp_model_ansible.joblib"),
+                    os.path.join(os.getcwd(), 'radondp_model.joblib'))
+
+        assert predict(args) == 0
+
+        os.remove(os.path.join(os.getcwd(), 'radondp_model.joblib'))
+        shutil.move(os.path.join(os.getcwd(), 'radondp_predictions.json'),
+                    os.path.join(playbooks_dir, 'radondp_predictions.json'))
+
+        with open(os.path.join(playbooks_dir, 'radondp_predictions.json'), 'r') as f:
+            predictions = json.load(f)
+            assert [item['file'] for item in predictions] == [os.path.join(playbooks_dir, 'first.yml'),
+                                                              os.path.join(playbooks_dir, 'second.yml')]
+            assert all(type(item['failure_prone']) == bool for item in predictions)
+
+    def test_predict_directory_batch(self):
+        playbooks_dir = os.path.join(self.predict_dir, 'playbooks_batch')
+        os.mkdir(playbooks_dir)
+
+        playbooks = [os.path.join(playbooks_dir, f'playbook_{i:02d}.yml') for i in range(10)]
+        for playbook in playbooks:
+            shutil.copy(self.playbook, playbook)
+
+        # Files that cannot be parsed or read must be skipped
+        with open(os.path.join(playbooks_dir, 'invalid.yml'), 'w') as f:
+            f.write('{{ invalid')
+
+        with open(os.path.join(playbooks_dir, 'latin1.yml'), 'wb') as f:
+            f.write('- name: caf\xe9'.encode('latin-1'))
+
+        args = Namespace(language='ansible', path_to_artefact=playbooks_dir)
+
+        shutil.copy(os.path.join(os.getcwd(), "test_data", "radondp_model_ansible.joblib"),
+                    os.path.join(os.getcwd(), 'radondp_model.joblib'))
+
+        # More scripts than a chunk per process and more than one CPU: metrics are extracted by a process pool
+        with mock.patch('os.cpu_count', return_value=2), mock.patch('radondp.cli._SCRIPTS_PER_PROCESS', 5):
+            assert predict(args) == 0
+
+        os.remove(os.path.join(os.getcwd(), 'radondp_model.joblib'))
+        shutil.move(os.path.join(os.getcwd(), 'radondp_predictions.json'),
+                    os.path.join(playbooks_dir, 'radondp_predictions.json'))
 
-            predict(args)
-        except SystemExit as exc:
+        with open(os.path.join(playbooks_dir, 'radondp_predictions.json'), 'r') as f:
+            predictions = json.load(f)
+            assert [item['file'] for item in predictions] == playbooks
 
-            assert exc.code == 0
+    def test_extract_all_metrics_main_from_stdin(self):
+        with open(self.playbook, 'r') as f:
+            scripts = [f.read()] * 4
 
-            shutil.move(os.path.join(os.getcwd(), 'radondp_model.joblib'),
-                        os.path.join( self.predict_dir, 'radondp_model_ansible.joblib'))
+        # Spawned workers cannot import a main module read from stdin: the scripts are analyzed in this process
+        main = mock.Mock(__file__='<stdin>')
+        with mock.patch('os.cpu_count', return_value=2), mock.patch('radondp.cli._SCRIPTS_PER_PROCESS', 2), \
+                mock.patch.dict('sys.modules', {'__main__': main}), \
+                mock.patch('concurrent.futures.ProcessPoolExecutor') as executor:
+            metrics = extract_all_metrics('ansible', scripts)
 
-            shutil.move(os.path.join(os.getcwd(), 'radondp_predictions.json'),
-                        os.path.join( self.predict_dir, 'radondp_predictions.json'))
+        executor.assert_not_called()
+        assert len(metrics) == 4 and all(metrics)
 
-            with open(os.path.join(self.predict_dir, 'radondp_predictions.json'), 'r') as f:
-                predictions = json.load(f)
-                assert len(predictions) == 1
-                assert predictions[0]['file'] == self.playbook
-                assert type(predictions[0]['failure_prone']) == bool
 
 if __name__ == '__main__':
     unittest.main()
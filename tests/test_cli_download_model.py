@@ -0,0 +1,86 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from argparse import Namespace
+from unittest import mock
+from requests.exceptions import ChunkedEncodingError, ConnectTimeout
+from radondp.cli import model as download_model
+
+
+def fake_response(chunks, status_code=200, encoding=None):
+    """
+    Build a streamed response returning the given chunks of the body
+    """
+    response = mock.Mock(status_code=status_code, ok=status_code < 400, encoding=encoding)
+    response.iter_content.side_effect = lambda chunk_size: iter(chunks)
+    return response
+
+
+class CLIDownloadModelTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.workdir = tempfile.mkdtemp()
+        os.chdir(self.workdir)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.workdir)
+
+    def download(self, session):
+        with mock.patch('radondp.cli.get_session', return_value=session):
+            return download_model(Namespace(language='ansible', host='github', repository='radon-h2020/repo'))
+
+    def test_download_model(self):
+        # Binary bodies larger than one chunk, including one that looks like the start of a JSON object
+        for head in (b'\x80\x04\x95', b'  {'):
+            with self.subTest(head=head):
+                body = head + os.urandom(3 * 1024 * 1024)
+                chunks = [body[i:i + 1024 * 1024] for i in range(0, len(body), 1024 * 1024)]
+
+                session = mock.Mock()
+                session.get.return_value = fake_response(chunks)
+
+                assert self.download(session) == 0
+
+                with open(os.path.join(self.workdir, 'radondp_model.joblib'), 'rb') as f:
+                    assert f.read() == body
+
+    def test_download_model_error_message(self):
+        session = mock.Mock()
+        session.get.return_value = fake_response([b'{"ERROR": "no model for ', b'this language"}'])
+
+        assert self.download(session) == 1
+        assert os.listdir(self.workdir) == []
+
+    def test_download_model_server_error(self):
+        session = mock.Mock()
+        session.get.return_value = fake_response([b'<html><body>Bad Gateway</body></html>'], status_code=502,
+                                                 encoding='utf-8')
+
+        assert self.download(session) == 1
+        assert os.listdir(self.workdir) == []
+
+    def test_download_model_connection_error(self):
+        session = mock.Mock()
+        session.get.side_effect = ConnectTimeout('connect timeout')
+
+        assert self.download(session) == 1
+        assert os.listdir(self.workdir) == []
+
+    def test_download_model_interrupted(self):
+        def chunks():
+            yield b'\x80\x03model'
+            raise ChunkedEncodingError('connection broken')
+
+        session = mock.Mock()
+        session.get.return_value = fake_response(chunks())
+
+        assert self.download(session) == 1
+        assert os.listdir(self.workdir) == []
+
+
+if __name__ == '__main__':
+    unittest.main()
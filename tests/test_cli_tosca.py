@@ -79,28 +79,52 @@ class CLIToscaTestCase(unittest.TestCase):
     def test_predict_csar_2(self):
         args = Namespace(language='tosca', path_to_artefact=self.tosca_csar)
 
-        try:
-            shutil.copy(os.path.join(os.getcwd(), "test_data", "radondp_model_ansible.joblib"),
-                        os.path.join(os.getcwd(), 'radondp_model.joblib'))
+        shutil.copy(os.path.join(os.getcwd(), "test_data", "radondp_model_ansible.joblib"),
+                    os.path.join(os.getcwd(), 'radondp_model.joblib'))
 
-            predict(args)
-        except SystemExit as exc:
+        assert predict(args) == 0
 
-            assert exc.code == 0
+        shutil.move(os.path.join(os.getcwd(), 'radondp_model.joblib'),
+                    os.path.join( self.predict_dir, 'radondp_model_ansible.joblib'))
 
-            shutil.move(os.path.join(os.getcwd(), 'radondp_model.joblib'),
-                        os.path.join( self.predict_dir, 'radondp_model_ansible.joblib'))
+        shutil.move(os.path.join(os.getcwd(), 'radondp_predictions.json'),
+                    os.path.join( self.predict_dir, 'radondp_predictions.json'))
 
-            shutil.move(os.path.join(os.getcwd(), 'radondp_predictions.json'),
-                        os.path.join( self.predict_dir, 'radondp_predictions.json'))
+        with open(os.path.join(self.predict_dir, 'radondp_predictions.json'), 'r') as f:
+            predictions = json.load(f)
+            files = set([item['file'] for item in predictions])
+            assert os.path.join(self.tosca_csar, '_definitions/radonartifacts__Ansible.tosca') in files
+            assert os.path.join(self.tosca_csar, '_definitions/radonnodesaws__AwsLambdaFunction.tosca') in files
+            assert os.path.join(self.tosca_csar, '_definitions/radondatatypesfunction__Entries.tosca') in files
 
-            with open(os.path.join(self.predict_dir, 'radondp_predictions.json'), 'r') as f:
-                predictions = json.load(f)
-                files = set([item['file'] for item in predictions])
-                assert os.path.join(self.tosca_csar, '_definitions/radonartifacts__Ansible.tosca') in files
-                assert os.path.join(self.tosca_csar, '_definitions/radonnodesaws__AwsLambdaFunction.tosca') in files
-                assert os.path.join(self.tosca_csar, '_definitions/radondatatypesfunction__Entries.tosca') in files
+    def test_predict_directory(self):
+        tosca_dir = os.path.join(self.predict_dir, 'tosca_dir')
+        os.mkdir(tosca_dir)
+        shutil.copy(self.tosca_definition, os.path.join(tosca_dir, 'definition.tosca'))
+        shutil.copy(self.tosca_csar, os.path.join(tosca_dir, 'tosca.csar'))
 
+        # Valid YAML, but not a Tosca definition: it must be skipped
+        with open(os.path.join(tosca_dir, 'list.tosca'), 'w') as f:
+            f.write('- x')
+
+        args = Namespace(language='tosca', path_to_artefact=tosca_dir)
+
+        shutil.copy(os.path.join(os.getcwd(), "test_data", "radondp_model_tosca.joblib"),
+                    os.path.join(os.getcwd(), 'radondp_model.joblib'))
+
+        assert predict(args) == 0
+
+        os.remove(os.path.join(os.getcwd(), 'radondp_model.joblib'))
+        shutil.move(os.path.join(os.getcwd(), 'radondp_predictions.json'),
+                    os.path.join(tosca_dir, 'radondp_predictions.json'))
+
+        with open(os.path.join(tosca_dir, 'radondp_predictions.json'), 'r') as f:
+            predictions = json.load(f)
+            files = [item['file'] for item in predictions]
+            assert files[0] == os.path.join(tosca_dir, 'definition.tosca')
+            assert os.path.join(tosca_dir, 'list.tosca') not in files
+            assert all(file.startswith(os.path.join(tosca_dir, 'tosca.csar')) for file in files[1:])
+            assert len(files) == 4
 
 
 if __name__ == '__main__':
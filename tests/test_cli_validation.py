@@ -1,7 +1,11 @@
+import os
+import tempfile
 import unittest
 
-from argparse import ArgumentTypeError
-from radondp.cli import valid_dir, valid_file, valid_balancers, valid_normalizers, valid_classifiers
+from argparse import ArgumentTypeError, HelpFormatter
+from unittest import mock
+from radondp.cli import COMMAND_PARSERS, build_command_parser, check_train_args, get_parser, valid_dir, valid_file, \
+    valid_path, valid_balancers, valid_normalizers, valid_classifiers
 
 
 class CLIValidationTestCase(unittest.TestCase):
@@ -14,17 +18,96 @@ class CLIValidationTestCase(unittest.TestCase):
         with self.assertRaises(ArgumentTypeError):
             valid_file('this/is/an/invalid/file.yml')
 
-    def test_valid_balancers(self):
+    def test_valid_path(self):
+        assert valid_path(__file__) == __file__
+        assert valid_path('tests') == 'tests'
+
         with self.assertRaises(ArgumentTypeError):
-            valid_balancers('none ros rus invalid')
+            valid_path('this/is/an/invalid/path')
+
+    def test_valid_path_created_later(self):
+        with tempfile.TemporaryDirectory() as workdir:
+            path = os.path.join(workdir, 'playbook.yml')
+
+            with self.assertRaises(ArgumentTypeError):
+                valid_file(path)
+
+            open(path, 'w').close()
+            assert valid_file(path) == path
+            assert valid_path(path) == path
+
+    def test_valid_balancers(self):
+        assert valid_balancers(' none  rus ros') == ['none', 'rus', 'ros']
+
+        for x in ('none ros rus invalid', '', ' '):
+            with self.assertRaises(ArgumentTypeError):
+                valid_balancers(x)
 
     def test_valid_normalizers(self):
-        with self.assertRaises(ArgumentTypeError):
-            valid_normalizers('none std minmax invalid')
+        assert valid_normalizers('none std minmax') == ['none', 'std', 'minmax']
+
+        for x in ('none std minmax invalid', ''):
+            with self.assertRaises(ArgumentTypeError):
+                valid_normalizers(x)
 
     def test_valid_classifiers(self):
-        with self.assertRaises(ArgumentTypeError):
-            valid_classifiers('dt logit nb rf svm invalid')
+        assert valid_classifiers('dt logit nb rf svm') == ['dt', 'logit', 'nb', 'rf', 'svm']
+
+        for x in ('dt logit nb rf svm invalid', ''):
+            with self.assertRaises(ArgumentTypeError):
+                valid_classifiers(x)
+
+    def test_check_train_args(self):
+        parser = get_parser()
+        check_train_args(parser, parser.parse_args(['train', __file__, 'nb rf', '-b', 'none  rus ros ', '-n', 'std']))
+
+        for argv in (['nb', '-b', 'none ros rus invalid'],
+                     ['nb', '-n', 'none std minmax invalid'],
+                     ['dt logit nb rf svm invalid']):
+            with self.assertRaises(SystemExit):
+                check_train_args(parser, parser.parse_args(['train', __file__] + argv))
+
+    def test_check_train_args_empty_list(self):
+        parser = get_parser()
+
+        for argv in ([''], ['nb', '-b', ''], ['nb', '-n', ' ']):
+            with self.assertRaises(SystemExit):
+                check_train_args(parser, parser.parse_args(['train', __file__] + argv))
+
+    def test_lazy_parser(self):
+        argv = ['train', __file__, 'nb rf', '-b', 'none rus']
+
+        parser = get_parser(lazy=True)
+        args, remaining_args = parser.parse_known_args(argv)
+        args = build_command_parser(parser, args.command).parse_args(remaining_args, namespace=args)
+
+        assert args == get_parser().parse_args(argv)
+
+    def test_parser_help(self):
+        formatters = []
+        init = HelpFormatter.__init__
+
+        def counting_init(formatter, *args, **kwargs):
+            formatters.append(formatter)
+            init(formatter, *args, **kwargs)
+
+        with mock.patch.object(HelpFormatter, '__init__', counting_init):
+            parser = get_parser()
+
+            # One validation formatter per parser, plus the one add_subparsers() uses to build the commands' prog
+            assert len(formatters) == 1 + len(COMMAND_PARSERS) + 1
+            validation_formatter = parser._validation_formatter
+
+            formatters.clear()
+            help_message = parser.format_help()
+            assert len(formatters) == 1 and formatters[0] is not validation_formatter
+
+            formatters.clear()
+            parser.format_usage()
+            assert len(formatters) == 1 and formatters[0] is not validation_formatter
+
+        assert help_message == parser.format_help()
+        assert 'train' in help_message
 
 
 if __name__ == '__main__':
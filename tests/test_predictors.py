@@ -0,0 +1,71 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import pandas as pd
+
+from unittest import mock
+from radondp.predictors import prepare_unseen_data, read_training_data
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+class ReadTrainingDataTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.workdir = tempfile.mkdtemp()
+        cls.path_to_csv = os.path.join(cls.workdir, 'training.csv')
+
+        with open(cls.path_to_csv, 'w') as f:
+            f.write('commit,committed_at,failure_prone,filepath,lines_code,num_tasks\n'
+                    'a1b2c3,2020-10-16T18:00:00,0,roles/main.yml,10,2\n'
+                    'd4e5f6,2020-10-17T09:30:00,1,,5.5,\n')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.workdir)
+
+    @unittest.skipIf(pyarrow is None, 'pyarrow is not installed')
+    def test_pyarrow_and_pandas_readers_agree(self):
+        with_pyarrow = read_training_data(self.path_to_csv)
+
+        with mock.patch.dict(sys.modules, {'pyarrow': None}):
+            with_pandas = read_training_data(self.path_to_csv)
+
+        pd.testing.assert_frame_equal(with_pyarrow, with_pandas, check_dtype=False)
+        assert list(with_pyarrow.dtypes) == list(with_pandas.dtypes)
+
+    def test_metadata_types(self):
+        data = read_training_data(self.path_to_csv)
+
+        assert data.commit.tolist() == ['a1b2c3', 'd4e5f6']
+        assert data.committed_at.tolist() == ['2020-10-16T18:00:00', '2020-10-17T09:30:00']
+        assert data.filepath.iloc[0] == 'roles/main.yml' and pd.isna(data.filepath.iloc[1])
+        assert data.failure_prone.tolist() == [0, 1]
+        assert data.lines_code.dtype == 'float32' and data.num_tasks.dtype == 'float32'
+
+
+class PrepareUnseenDataTestCase(unittest.TestCase):
+
+    def test_prepare_unseen_data(self):
+        data = prepare_unseen_data([{'lines_code': 10, 'num_tasks': 2}, {'num_tasks': 1, 'lines_code': 5}])
+
+        assert list(data.columns) == ['lines_code', 'num_tasks']
+        assert data.values.tolist() == [[10, 2], [5, 1]]
+        assert all(dtype == 'float32' for dtype in data.dtypes)
+
+    def test_prepare_unseen_data_different_metrics(self):
+        data = prepare_unseen_data([{'lines_code': 10, 'num_tasks': 2}, {'lines_code': 5, 'num_imports': 3}])
+
+        assert list(data.columns) == ['lines_code', 'num_tasks', 'num_imports']
+        assert data.values.tolist() == [[10, 2, 0], [5, 0, 3]]
+
+
+if __name__ == '__main__':
+    unittest.main()